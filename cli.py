@@ -2,32 +2,26 @@
 Command-line interface for BBL decoder
 """
 
+import os
 import sys
-import json
-from decoder import decode_bbl_file
+import orjson
+from decoder import decode_bbl_files
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: python cli.py <bbl_file>")
-        sys.exit(1)
-    
-    file_path = sys.argv[1]
-    
-    print(f"Decoding BBL file: {file_path}")
-    result = decode_bbl_file(file_path)
-    
+def report(file_path: str, result: dict, pretty: bool) -> bool:
+    """Print a summary of one decoded file and save the full result as JSON"""
     if 'error' in result:
         print(f"Error: {result['error']}")
-        sys.exit(1)
+        return False
     
+    gyro = result['gyro_data']['gyro']
     print(f"Successfully decoded {result['frame_count']} frames")
-    print(f"Extracted {len(result['gyro_data'])} gyro data points")
+    print(f"Extracted {len(gyro)} gyro data points")
     
     # Print first few gyro data points
-    if result['gyro_data']:
+    if len(gyro):
         print("\nFirst 5 gyro data points:")
-        for i, data in enumerate(result['gyro_data'][:5]):
-            print(f"  {i+1}: X={data['gyro_x']:.2f}°/s, Y={data['gyro_y']:.2f}°/s, Z={data['gyro_z']:.2f}°/s")
+        for i, (x, y, z) in enumerate(gyro[:5].tolist()):
+            print(f"  {i+1}: X={x:.2f}°/s, Y={y:.2f}°/s, Z={z:.2f}°/s")
     
     # Print headers
     if result['headers']:
@@ -35,12 +29,43 @@ def main():
         for key, value in result['headers'].items():
             print(f"  {key}: {value}")
     
-    # Save detailed results to JSON
-    output_file = file_path.replace('.bbl', '_decoded.json')
-    with open(output_file, 'w') as f:
-        json.dump(result, f, indent=2)
+    # Save detailed results to JSON (compact unless --pretty is given); the
+    # gyro arrays are serialized directly by orjson
+    base, _ = os.path.splitext(file_path)
+    output_file = base + '_decoded.json'
+    options = orjson.OPT_SERIALIZE_NUMPY
+    if pretty:
+        options |= orjson.OPT_INDENT_2
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(result, option=options))
     
     print(f"\nDetailed results saved to: {output_file}")
+    return True
+
+def main():
+    args = sys.argv[1:]
+    pretty = '--pretty' in args
+    if pretty:
+        args.remove('--pretty')
+    
+    if not args:
+        print("Usage: python cli.py [--pretty] <bbl_file> [<bbl_file> ...]")
+        sys.exit(1)
+    
+    for file_path in args:
+        print(f"Decoding BBL file: {file_path}")
+    
+    # Files are independent, so several are decoded in parallel processes
+    results = decode_bbl_files(args)
+    
+    succeeded = True
+    for file_path, result in zip(args, results):
+        if len(args) > 1:
+            print(f"\n=== {file_path} ===")
+        succeeded = report(file_path, result, pretty) and succeeded
+    
+    if not succeeded:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
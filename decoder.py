@@ -3,54 +3,211 @@ BBL (Betaflight Blackbox Log) Decoder
 Implements proper BBL format parsing based on technical specifications
 """
 
+import os
+import re
 import struct
-from typing import Dict, List, Any, Optional, Tuple, BinaryIO
-from bitstring import BitStream
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Dict, List, Any, Optional, Tuple, Callable, Iterable
+import numpy as np
+import kernels
 from specs import *
 
+# Precompiled little-endian u16 unpacker for NEG_14BIT fields
+_unpack_u16 = struct.Struct('<H').unpack_from
+
+# One match per "H key:value" header line
+_HEADER_RE = re.compile(rb'^[^\S\n]*H ([^:\r\n]*):([^\r\n]*)', re.M)
+
+# First line that ends the header section: a blank line, the log start
+# marker or a field definition line
+_HEADER_END_RE = re.compile(
+    rb'^(?:(?P<blank>\r*)|[^\S\n]*(?P<start>' + re.escape(BBL_LOG_START_MARKER) + rb')[^\S\n]*)$'
+    rb'|^[^\S\n]*(?P<fields>F )',
+    re.M
+)
+
+# Byte patterns for stepping over a field without decoding it. A varint is
+# up to four continuation bytes plus a terminator byte (the readers give up
+# after five bytes); NEG_14BIT is always two bytes.
+_SKIP_VARINT = rb'(?:[\x80-\xff]{0,4}[\x00-\x7f]|[\x80-\xff]{5})'
+_SKIP_NEG_14BIT = rb'[\x00-\xff]{2}'
+
+# Frame types that are skipped, with the field count assumed when the
+# headers don't define their fields
+SKIPPED_FRAME_FIELDS = {'S': 5, 'G': 10, 'H': 10, 'E': 2}
+
+# Source for the value a P frame field predicts from its column `c`, given
+# the frame count `n` (at least one earlier frame). Predictors not listed
+# here repeat the last value; ZERO adds nothing.
+_PREDICTOR_SOURCE = {
+    PredictorType.ZERO: None,
+    PredictorType.STRAIGHT_LINE: '(2 * {c}[-1] - {c}[-2] if n >= 2 else {c}[-1])',
+    PredictorType.AVERAGE_2: '(({c}[-1] + {c}[-2]) // 2 if n >= 2 else {c}[-1])',
+    PredictorType.INCREMENT: '{c}[-1] + 1',
+}
+
+# Predictor source for fields whose predictor has no entry above
+_LAST_VALUE_SOURCE = '{c}[-1]'
+
+# Layouts with more columns than this are decoded by a per-field loop;
+# compiling straight-line source gets slow for very wide headers
+_MAX_GENERATED_COLUMNS = 256
+
+def _append_wrapped(columns, values, frame_count: int):
+    """
+    Store a frame's values wrapped to int64, as the compiled kernel does.
+    
+    Runaway predictions can leave the int64 range of the columns; the
+    frame's values already appended before the overflow are replaced.
+    """
+    for column, value in zip(columns, values):
+        del column[frame_count:]
+        column.append((value + (1 << 63)) % (1 << 64) - (1 << 63))
+
+@lru_cache(maxsize=64)
+def _frame_decoder_factory(field_count: int, predictors: Optional[Tuple[int, ...]],
+                           pad_count: int) -> Callable:
+    """
+    Generate a straight-line decoder for one frame layout.
+    
+    The field count, predictors (None for frames that aren't predicted) and
+    number of padded columns are fixed once the headers are parsed, so the
+    per-field loop is unrolled into source and compiled once per layout.
+    Returns bind(readers, columns, padding, frame_types, marker), which
+    closes over one decode's columns and returns decode(buf, pos) -> pos.
+    """
+    fields = range(field_count)
+    lines = ['def bind(readers, columns, padding, frame_types, marker):']
+    lines += [f'    read_{i} = readers[{i}]' for i in fields]
+    lines += [f'    col_{i} = columns[{i}]' for i in fields]
+    lines += [f'    append_{i} = col_{i}.append' for i in fields]
+    lines += [f'    pad_{i} = padding[{i}].append' for i in range(pad_count)]
+    lines += ['    append_frame_type = frame_types.append',
+              '    def decode(buf, pos):']
+    if field_count:
+        lines += [f'        v{i}, pos = read_{i}(buf, pos)' for i in fields]
+        
+        # Predictors only apply once there is a previous frame
+        predicted = []
+        for i, predictor in enumerate(predictors or ()):
+            source = _PREDICTOR_SOURCE.get(predictor, _LAST_VALUE_SOURCE)
+            if source is not None:
+                predicted.append(f'            v{i} += ' + source.format(c=f'col_{i}'))
+        if predicted:
+            lines += ['        n = len(frame_types)',
+                      '        if n:'] + predicted
+        
+        values = ''.join(f'v{i}, ' for i in fields)
+        lines += ['        try:']
+        lines += [f'            append_{i}(v{i})' for i in fields]
+        lines += ['        except OverflowError:',
+                  f'            append_wrapped(columns, ({values}), len(frame_types))']
+        lines += [f'        pad_{i}(0)' for i in range(pad_count)]
+        lines += ['        append_frame_type(marker)']
+    lines += ['        return pos',
+              '    return decode']
+    
+    namespace = {'append_wrapped': _append_wrapped}
+    exec(compile('\n'.join(lines), f'<frame decoder {field_count}>', 'exec'), namespace)
+    return namespace['bind']
+
+@lru_cache(maxsize=None)
+def _predictor_function(predictor: int) -> Optional[Callable]:
+    """Compile a predictor's source into predict(c, n), or None for ZERO"""
+    source = _PREDICTOR_SOURCE.get(predictor, _LAST_VALUE_SOURCE)
+    if source is None:
+        return None
+    return eval('lambda c, n: ' + source.format(c='c'))
+
+def _bind_frame_loop(predictors: Optional[Tuple[int, ...]], readers, columns, padding,
+                     frame_types, marker) -> Callable:
+    """Per-field loop equivalent of a generated decoder, for wide layouts"""
+    predict = [_predictor_function(predictor) for predictor in predictors or ()]
+    predicted = [(i, columns[i], function) for i, function in enumerate(predict) if function]
+    
+    def decode(buf, pos):
+        if not readers:
+            return pos
+        values = []
+        for read in readers:
+            value, pos = read(buf, pos)
+            values.append(value)
+        
+        # Predictors only apply once there is a previous frame
+        n = len(frame_types)
+        if n:
+            for i, column, function in predicted:
+                values[i] += function(column, n)
+        
+        try:
+            for column, value in zip(columns, values):
+                column.append(value)
+        except OverflowError:
+            _append_wrapped(columns, values, n)
+        for column in padding:
+            column.append(0)
+        frame_types.append(marker)
+        return pos
+    
+    return decode
+
 class BBLDecoder:
     def __init__(self):
         self.headers = {}
         self.field_definitions = {}
-        self.frame_history = []
+        self.columns = {}
+        self.frame_types = array('B')
         self.current_frame_data = {}
-        self.gyro_data = []
+        self.gyro_data = {}
+        
+        # Field readers indexed by encoding; encodings without a dedicated
+        # reader are decoded as signed variable byte
+        self._readers = [self._read_signed_vb] * (max(FieldEncoding) + 1)
+        self._readers[FieldEncoding.UNSIGNED_VB] = self._read_unsigned_vb
+        self._readers[FieldEncoding.NEG_14BIT] = self._read_neg_14bit
         
     def decode_file(self, file_path: str) -> Dict[str, Any]:
         """Decode a BBL file and extract gyro data"""
         try:
             with open(file_path, 'rb') as f:
-                return self._decode_stream(f)
+                data = f.read()
+            return self._decode_buffer(data)
         except Exception as e:
-            return {'error': f'Failed to decode file: {str(e)}', 'gyro_data': []}
+            return {'error': f'Failed to decode file: {str(e)}', 'gyro_data': empty_gyro_data()}
     
     def decode_bytes(self, data: bytes) -> Dict[str, Any]:
         """Decode BBL data from bytes"""
         try:
-            from io import BytesIO
-            stream = BytesIO(data)
-            return self._decode_stream(stream)
+            return self._decode_buffer(data)
         except Exception as e:
-            return {'error': f'Failed to decode bytes: {str(e)}', 'gyro_data': []}
+            return {'error': f'Failed to decode bytes: {str(e)}', 'gyro_data': empty_gyro_data()}
     
-    def _decode_stream(self, stream: BinaryIO) -> Dict[str, Any]:
-        """Main decoding logic for BBL stream"""
+    def _decode_buffer(self, data: bytes) -> Dict[str, Any]:
+        """Main decoding logic for an in-memory BBL log"""
         self.headers = {}
         self.field_definitions = {}
-        self.frame_history = []
+        self.columns = {}
+        self.frame_types = array('B')
         self.current_frame_data = {}
-        self.gyro_data = []
+        self.gyro_data = {}
         
         # Parse headers first
-        if not self._parse_headers(stream):
-            return {'error': 'Failed to parse headers', 'gyro_data': []}
+        frames_start = self._parse_headers(data)
+        if frames_start is None:
+            return {'error': 'Failed to parse headers', 'gyro_data': empty_gyro_data()}
         
         # Parse field definitions
-        if not self._parse_field_definitions(stream):
-            return {'error': 'Failed to parse field definitions', 'gyro_data': []}
+        if not self._parse_field_definitions():
+            return {'error': 'Failed to parse field definitions', 'gyro_data': empty_gyro_data()}
         
-        # Parse data frames
-        frame_count = self._parse_data_frames(stream)
+        # Frame parsers walk a zero-copy view of the data with an integer offset
+        buf = memoryview(data)[frames_start:]
+        
+        # Parse data frames into columns, then extract gyro data from them
+        frame_count = self._parse_data_frames(buf)
+        self._extract_gyro_data()
         
         return {
             'success': True,
@@ -60,42 +217,34 @@ class BBLDecoder:
             'gyro_data': self.gyro_data
         }
     
-    def _parse_headers(self, stream: BinaryIO) -> bool:
-        """Parse BBL file headers"""
+    def _parse_headers(self, data: bytes) -> Optional[int]:
+        """Parse BBL file headers, returning the offset where frame data starts"""
         try:
-            while True:
-                line = self._read_line(stream)
-                if not line:
-                    break
-                
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Check for header marker
-                if line.startswith(b'H '):
-                    header_data = line[2:].decode('utf-8', errors='ignore')
-                    if ':' in header_data:
-                        key, value = header_data.split(':', 1)
-                        self.headers[key.strip()] = value.strip()
-                
-                # Check for log start marker
-                elif line == BBL_LOG_START_MARKER:
-                    # Found start marker, stream is now positioned for frame data
-                    return True
-                
-                # Check for field definition
-                elif line.startswith(b'F '):
-                    # Field definitions come after headers, go back and let field parser handle
-                    stream.seek(stream.tell() - len(line) - 1)  # Go back
-                    return True
+            end_match = _HEADER_END_RE.search(data)
+            headers_end = end_match.start() if end_match else len(data)
+            
+            # Extract every header in the section with one regex scan
+            for match in _HEADER_RE.finditer(data, 0, headers_end):
+                key = match.group(1).decode('utf-8', errors='ignore').strip()
+                self.headers[key] = match.group(2).decode('utf-8', errors='ignore').strip()
+            
+            if end_match is None:
+                return len(data) if self.headers else None
+            
+            # Field definitions come after headers, frame parsing starts at this line
+            if end_match.group('fields') is not None:
+                return end_match.start()
             
-            return len(self.headers) > 0
+            # Otherwise frame data follows the terminating line
+            frames_start = min(end_match.end() + 1, len(data))
+            if end_match.group('start') is not None:
+                return frames_start
+            return frames_start if self.headers else None
         except Exception as e:
             print(f"Header parsing error: {e}")
-            return False
+            return None
     
-    def _parse_field_definitions(self, stream: BinaryIO) -> bool:
+    def _parse_field_definitions(self) -> bool:
         """Parse field definitions from headers"""
         try:
             # Parse field definitions from headers
@@ -104,20 +253,22 @@ class BBLDecoder:
             field_predictors = {}
             field_signed = {}
             
-            # Extract field information from headers
+            # Extract field information from headers; the comma-separated
+            # integer lists are converted in one NumPy call, which rejects
+            # empty, trailing or non-numeric entries just like int()
             for key, value in self.headers.items():
                 if key.startswith('Field ') and key.endswith(' name'):
                     frame_type = key.split()[1]
                     field_names[frame_type] = value.split(',')
                 elif key.startswith('Field ') and key.endswith(' encoding'):
                     frame_type = key.split()[1]
-                    field_encodings[frame_type] = [int(x) for x in value.split(',')]
+                    field_encodings[frame_type] = np.array(value.split(','), dtype=np.int64)
                 elif key.startswith('Field ') and key.endswith(' predictor'):
                     frame_type = key.split()[1]
-                    field_predictors[frame_type] = [int(x) for x in value.split(',')]
+                    field_predictors[frame_type] = np.array(value.split(','), dtype=np.int64)
                 elif key.startswith('Field ') and key.endswith(' signed'):
                     frame_type = key.split()[1]
-                    field_signed[frame_type] = [int(x) for x in value.split(',')]
+                    field_signed[frame_type] = np.array(value.split(','), dtype=np.int64)
             
             # Build field definitions
             for frame_type in field_names:
@@ -125,8 +276,11 @@ class BBLDecoder:
                     self.field_definitions[frame_type] = {}
                 
                 names = field_names[frame_type]
-                encodings = field_encodings.get(frame_type, [0] * len(names))
-                predictors = field_predictors.get(frame_type, [0] * len(names))
+                default = np.zeros(len(names), dtype=np.int64)
+                
+                # Back to plain ints once per frame type so definitions stay JSON serializable
+                encodings = field_encodings.get(frame_type, default).tolist()
+                predictors = field_predictors.get(frame_type, default).tolist()
                 
                 for i, name in enumerate(names):
                     encoding = encodings[i] if i < len(encodings) else 0
@@ -144,43 +298,96 @@ class BBLDecoder:
             if not self.field_definitions:
                 self.field_definitions = DEFAULT_FIELD_DEFS.copy()
             
+            # Flatten each frame type's definitions into field order plus
+            # parallel encoding/predictor arrays for the frame loop
+            self._frame_schema = {
+                frame_type: (
+                    tuple(field_defs),
+                    array('i', [int(d['encoding']) for d in field_defs.values()]),
+                    array('i', [int(d['predictor']) for d in field_defs.values()]),
+                )
+                for frame_type, field_defs in self.field_definitions.items()
+            }
+            self._frame_readers = {
+                frame_type: tuple(self._field_reader(encoding) for encoding in encodings)
+                for frame_type, (_, encodings, _) in self._frame_schema.items()
+            }
+            
+            # Skipped frames are stepped over using their field encodings, so
+            # the byte length is exact whenever the headers define the frame
+            self._skip_encodings = {}
+            self._skip_patterns = {}
+            for frame_type, field_count in SKIPPED_FRAME_FIELDS.items():
+                if frame_type in self._frame_schema:
+                    encodings = self._frame_schema[frame_type][1]
+                else:
+                    encodings = array('i', [FieldEncoding.SIGNED_VB] * field_count)
+                self._skip_encodings[frame_type] = encodings
+                self._skip_patterns[frame_type] = re.compile(b''.join(
+                    _SKIP_NEG_14BIT if encoding == FieldEncoding.NEG_14BIT else _SKIP_VARINT
+                    for encoding in encodings
+                ))
+            
             return True
         except Exception as e:
             print(f"Field definition parsing error: {e}")
             return False
     
-    def _parse_data_frames(self, stream: BinaryIO) -> int:
-        """Parse data frames and extract gyro data"""
-        frame_count = 0
+    def _init_columns(self):
+        """Allocate one int64 column per distinct I/P field name"""
+        self.columns = {}
+        for frame_type in ('I', 'P'):
+            for name in self._frame_schema.get(frame_type, ((),))[0]:
+                if name not in self.columns:
+                    self.columns[name] = array('q')
+        self.frame_types = array('B')
+    
+    def _bind_frame_decoders(self):
+        """Bind a decoder for each main frame type to the current columns"""
+        # Columns a frame type doesn't carry are padded with zeros
+        self._decoders = {}
+        for frame_type in ('I', 'P'):
+            names, _, predictors = self._frame_schema.get(frame_type, ((), (), ()))
+            carried = set(names)
+            missing = tuple(column for name, column in self.columns.items() if name not in carried)
+            predictors = tuple(predictors) if frame_type == 'P' else None
+            args = (
+                self._frame_readers.get(frame_type, ()),
+                tuple(self.columns[name] for name in names),
+                missing,
+                self.frame_types,
+                ord(frame_type),
+            )
+            if len(names) + len(missing) > _MAX_GENERATED_COLUMNS:
+                self._decoders[frame_type] = _bind_frame_loop(predictors, *args)
+            else:
+                factory = _frame_decoder_factory(len(names), predictors, len(missing))
+                self._decoders[frame_type] = factory(*args)
+    
+    def _parse_data_frames(self, buf: memoryview) -> int:
+        """Parse data frames into field columns"""
+        self._init_columns()
+        if kernels.HAVE_NUMBA:
+            frame_count = self._parse_data_frames_compiled(buf)
+            if frame_count is not None:
+                return frame_count
+        self._bind_frame_decoders()
+        
+        pos = 0
+        end = len(buf)
+        decoders = self._decoders
         
         try:
-            while True:
+            while pos < end:
                 # Read frame marker
-                marker = stream.read(1)
-                if not marker:
-                    break
-                
-                frame_type = marker.decode('ascii', errors='ignore')
+                frame_type = chr(buf[pos])
+                pos += 1
                 
-                if frame_type in ['I', 'P']:  # Main frames with gyro data
-                    frame_data = self._parse_main_frame(stream, frame_type)
-                    if frame_data:
-                        self._extract_gyro_data(frame_data)
-                        self.frame_history.append(frame_data)
-                        frame_count += 1
-                        
-                        # Keep only recent history for prediction
-                        if len(self.frame_history) > 10:
-                            self.frame_history = self.frame_history[-10:]
+                if frame_type in decoders:  # Main frames with gyro data
+                    pos = decoders[frame_type](buf, pos)
                 
-                elif frame_type == 'S':  # Slow frame
-                    self._skip_slow_frame(stream)
-                
-                elif frame_type in ['G', 'H']:  # GPS frames
-                    self._skip_gps_frame(stream)
-                
-                elif frame_type == 'E':  # Event frame
-                    self._skip_event_frame(stream)
+                elif frame_type in SKIPPED_FRAME_FIELDS:  # Slow, GPS and event frames
+                    pos = self._skip_frame(buf, pos, frame_type)
                 
                 else:
                     # Unknown frame type, stop parsing
@@ -189,206 +396,236 @@ class BBLDecoder:
         except Exception as e:
             print(f"Frame parsing error: {e}")
         
+        # Drop any values of a frame that failed part way through
+        frame_count = len(self.frame_types)
+        for column in self.columns.values():
+            del column[frame_count:]
+        
         return frame_count
     
-    def _parse_main_frame(self, stream: BinaryIO, frame_type: str) -> Optional[Dict[str, Any]]:
-        """Parse main frame (I or P type) containing gyro data"""
-        try:
-            frame_data = {'frame_type': frame_type}
-            field_defs = self.field_definitions.get(frame_type, {})
-            
-            # Read frame data based on field definitions
-            for field_name, field_def in field_defs.items():
-                try:
-                    value = self._read_field_value(stream, field_def['encoding'])
-                    
-                    # Apply predictor if this is a P frame
-                    if frame_type == 'P' and self.frame_history:
-                        value = self._apply_predictor(value, field_name, field_def['predictor'])
-                    
-                    frame_data[field_name] = value
-                    
-                except Exception as e:
-                    # If we can't read a field, try to continue
-                    print(f"Error reading field {field_name}: {e}")
-                    break
-            
-            return frame_data if len(frame_data) > 1 else None
-            
-        except Exception as e:
-            print(f"Main frame parsing error: {e}")
-            return None
+    def _parse_data_frames_compiled(self, buf: memoryview) -> Optional[int]:
+        """Parse data frames into field columns with the compiled kernel (None if it won't compile)"""
+        # Column index of each field in the kernel's output matrix
+        index = {name: i for i, name in enumerate(self.columns)}
+        
+        def schema(frame_type):
+            names, encodings, predictors = self._frame_schema.get(frame_type, ((), [], []))
+            return (
+                np.array([index[name] for name in names], dtype=np.int32),
+                np.array(encodings, dtype=np.int32),
+                np.array(predictors, dtype=np.int32),
+            )
+        
+        data = np.frombuffer(buf, dtype=np.uint8)
+        i_schema = schema('I')
+        p_schema = schema('P')
+        skip_encodings = [np.array(self._skip_encodings[frame_type], dtype=np.int32)
+                          for frame_type in ('S', 'G', 'H', 'E')]
+        
+        # Start from a fraction of the worst case (one byte per field) and
+        # double whenever the kernel reports the output is full
+        max_fields = max(len(i_schema[0]), len(p_schema[0]))
+        capacity = len(data) // (4 * (max_fields + 1)) + 16
+        out = np.zeros((capacity, max(len(index), 1)), dtype=np.int64)
+        frame_types = np.zeros(capacity, dtype=np.uint8)
+        
+        n = 0
+        pos = 0
+        while True:
+            try:
+                n, pos, full = kernels.decode_frames(data, pos, n, *i_schema, *p_schema,
+                                                     *skip_encodings, out, frame_types)
+            except kernels.NumbaError as e:
+                # The kernel failed to compile; fall back to the Python path
+                # and don't retry the compile for every later log
+                print(f"Compiled kernel unavailable, using Python decoder: {e}")
+                kernels.HAVE_NUMBA = False
+                return None
+            if not full:
+                break
+            out = np.concatenate([out, np.zeros_like(out)])
+            frame_types = np.concatenate([frame_types, np.zeros_like(frame_types)])
+        
+        self.columns = {name: out[:n, i] for name, i in index.items()}
+        self.frame_types = frame_types[:n]
+        return n
+    
+    def _read_field_value(self, buf: memoryview, pos: int, encoding: int) -> Tuple[int, int]:
+        """Read a field value based on its encoding, returning (value, new_pos)"""
+        return self._field_reader(encoding)(buf, pos)
     
-    def _read_field_value(self, stream: BinaryIO, encoding: int) -> int:
-        """Read a field value based on its encoding"""
-        if encoding == FieldEncoding.SIGNED_VB:
-            return self._read_signed_vb(stream)
-        elif encoding == FieldEncoding.UNSIGNED_VB:
-            return self._read_unsigned_vb(stream)
-        elif encoding == FieldEncoding.NEG_14BIT:
-            return self._read_neg_14bit(stream)
-        else:
-            # Default to signed variable byte
-            return self._read_signed_vb(stream)
+    def _field_reader(self, encoding: int):
+        """Look up the reader for an encoding in the dispatch table"""
+        if 0 <= encoding < len(self._readers):
+            return self._readers[encoding]
+        # Default to signed variable byte
+        return self._read_signed_vb
     
-    def _read_signed_vb(self, stream: BinaryIO) -> int:
-        """Read signed variable-length integer"""
+    def _read_signed_vb(self, buf: memoryview, pos: int) -> Tuple[int, int]:
+        """Read signed variable-length integer, returning (value, new_pos)"""
         try:
-            result = 0
-            shift = 0
+            byte_val = buf[pos]
+            pos += 1
             
+            # Fast path: most deltas fit in a single byte
+            if byte_val < 0x80:
+                return (byte_val ^ 0x40) - 0x40, pos
+            
+            result = byte_val & 0x7F
+            shift = 7
             while True:
-                byte_data = stream.read(1)
-                if not byte_data:
-                    return 0
-                
-                byte_val = byte_data[0]
+                byte_val = buf[pos]
+                pos += 1
                 result |= (byte_val & 0x7F) << shift
                 
-                if (byte_val & 0x80) == 0:
+                if byte_val < 0x80:
                     break
                 
                 shift += 7
                 if shift > 28:  # Prevent infinite loop
                     break
-            
-            # Convert to signed
-            if result & (1 << (shift + 6)):
-                result -= (1 << (shift + 7))
-            
-            return result
-        except:
-            return 0
+        except IndexError:
+            # Truncated value at end of buffer
+            return 0, len(buf)
+        
+        # Convert to signed: sign-extend from the top payload bit without a branch
+        sign_bit = 1 << (shift + 6)
+        return (result ^ sign_bit) - sign_bit, pos
     
-    def _read_unsigned_vb(self, stream: BinaryIO) -> int:
-        """Read unsigned variable-length integer"""
+    def _read_unsigned_vb(self, buf: memoryview, pos: int) -> Tuple[int, int]:
+        """Read unsigned variable-length integer, returning (value, new_pos)"""
         try:
-            result = 0
-            shift = 0
+            byte_val = buf[pos]
+            pos += 1
             
+            # Fast path: single-byte values need no shifting
+            if byte_val < 0x80:
+                return byte_val, pos
+            
+            result = byte_val & 0x7F
+            shift = 7
             while True:
-                byte_data = stream.read(1)
-                if not byte_data:
-                    return 0
-                
-                byte_val = byte_data[0]
+                byte_val = buf[pos]
+                pos += 1
                 result |= (byte_val & 0x7F) << shift
                 
-                if (byte_val & 0x80) == 0:
+                if byte_val < 0x80:
                     break
                 
                 shift += 7
                 if shift > 28:  # Prevent infinite loop
                     break
-            
-            return result
-        except:
-            return 0
+        except IndexError:
+            # Truncated value at end of buffer
+            return 0, len(buf)
+        
+        return result, pos
     
-    def _read_neg_14bit(self, stream: BinaryIO) -> int:
-        """Read negative 14-bit value"""
+    def _read_neg_14bit(self, buf: memoryview, pos: int) -> Tuple[int, int]:
+        """Read negative 14-bit value, returning (value, new_pos)"""
         try:
-            data = stream.read(2)
-            if len(data) < 2:
-                return 0
-            
-            value = struct.unpack('<H', data)[0]
-            return -(value & 0x3FFF)
-        except:
-            return 0
-    
-    def _apply_predictor(self, delta: int, field_name: str, predictor_type: int) -> int:
-        """Apply predictor to delta value for P frames"""
-        if not self.frame_history:
-            return delta
+            value = _unpack_u16(buf, pos)[0]
+        except struct.error:
+            # Truncated value at end of buffer
+            return 0, len(buf)
         
-        last_frame = self.frame_history[-1]
-        
-        if predictor_type == PredictorType.ZERO:
-            predicted = 0
-        elif predictor_type == PredictorType.STRAIGHT_LINE:
-            if len(self.frame_history) >= 2:
-                predicted = 2 * last_frame.get(field_name, 0) - self.frame_history[-2].get(field_name, 0)
-            else:
-                predicted = last_frame.get(field_name, 0)
-        elif predictor_type == PredictorType.AVERAGE_2:
-            if len(self.frame_history) >= 2:
-                predicted = (last_frame.get(field_name, 0) + self.frame_history[-2].get(field_name, 0)) // 2
-            else:
-                predicted = last_frame.get(field_name, 0)
-        elif predictor_type == PredictorType.INCREMENT:
-            predicted = last_frame.get(field_name, 0) + 1
-        else:
-            predicted = last_frame.get(field_name, 0)
-        
-        return predicted + delta
+        return -(value & 0x3FFF), pos + 2
     
-    def _extract_gyro_data(self, frame_data: Dict[str, Any]):
-        """Extract and scale gyro data from frame"""
-        gyro_x = frame_data.get('gyroADC[0]', 0)
-        gyro_y = frame_data.get('gyroADC[1]', 0)
-        gyro_z = frame_data.get('gyroADC[2]', 0)
+    def _extract_gyro_data(self):
+        """Extract and scale gyro data from the decoded columns"""
+        frame_count = len(self.frame_types)
+        frame_types = np.asarray(self.frame_types, dtype=np.uint8)
         
-        # Scale gyro values to degrees/second
-        gyro_x_scaled = gyro_x * GYRO_SCALE
-        gyro_y_scaled = gyro_y * GYRO_SCALE
-        gyro_z_scaled = gyro_z * GYRO_SCALE
+        def column(name):
+            if name in self.columns:
+                return np.asarray(self.columns[name], dtype=np.int64)
+            return np.zeros(frame_count, dtype=np.int64)
         
-        timestamp = frame_data.get('time', len(self.gyro_data))
+        # Frames whose type has no time field are stamped with their index
+        timestamps = np.arange(frame_count, dtype=np.int64)
+        for frame_type in ('I', 'P'):
+            if 'time' in self.field_definitions.get(frame_type, {}):
+                mask = frame_types == ord(frame_type)
+                timestamps[mask] = column('time')[mask]
         
-        self.gyro_data.append({
-            'timestamp': timestamp,
-            'gyro_x': gyro_x_scaled,
-            'gyro_y': gyro_y_scaled,
-            'gyro_z': gyro_z_scaled,
-            'gyro_x_raw': gyro_x,
-            'gyro_y_raw': gyro_y,
-            'gyro_z_raw': gyro_z
-        })
-    
-    def _skip_slow_frame(self, stream: BinaryIO):
-        """Skip slow frame data"""
-        # Slow frames typically have fewer fields, try to read a reasonable amount
-        try:
-            for _ in range(5):  # Assume max 5 fields
-                self._read_signed_vb(stream)
-        except:
-            pass
-    
-    def _skip_gps_frame(self, stream: BinaryIO):
-        """Skip GPS frame data"""
-        try:
-            for _ in range(10):  # GPS frames can have many fields
-                self._read_signed_vb(stream)
-        except:
-            pass
-    
-    def _skip_event_frame(self, stream: BinaryIO):
-        """Skip event frame data"""
-        try:
-            # Event frames are usually small
-            self._read_unsigned_vb(stream)  # Event type
-            self._read_unsigned_vb(stream)  # Event data
-        except:
-            pass
+        gyro_raw = np.column_stack([column(name) for name in GYRO_FIELDS])
+        
+        # Keep gyro data as arrays, scaled to degrees/second in one vector
+        # op; per-sample dicts are only built on request with to_dicts()
+        self.gyro_data = {
+            'timestamps': timestamps,
+            'gyro': gyro_raw * GYRO_SCALE,
+            'gyro_raw': gyro_raw
+        }
     
-    def _read_line(self, stream: BinaryIO) -> bytes:
-        """Read a line from the stream"""
-        line = b''
-        while True:
-            char = stream.read(1)
-            if not char or char == b'\n':
-                break
-            if char != b'\r':
-                line += char
-        return line
+    def _skip_frame(self, buf: memoryview, pos: int, frame_type: str) -> int:
+        """Skip over a frame's fields without decoding them"""
+        match = self._skip_patterns[frame_type].match(buf, pos)
+        if match is None:
+            # Truncated frame at end of buffer
+            return len(buf)
+        return match.end()
 
-def decode_bbl_file(file_path: str) -> Dict[str, Any]:
+def decode_bbl_file(file_path: str, as_dicts: bool = False) -> Dict[str, Any]:
     """Convenience function to decode a BBL file"""
     decoder = BBLDecoder()
-    return decoder.decode_file(file_path)
+    return _gyro_output(decoder.decode_file(file_path), as_dicts)
 
-def decode_bbl_bytes(data: bytes) -> Dict[str, Any]:
+def decode_bbl_bytes(data: bytes, as_dicts: bool = False) -> Dict[str, Any]:
     """Convenience function to decode BBL data from bytes"""
     decoder = BBLDecoder()
-    return decoder.decode_bytes(data)
\ No newline at end of file
+    return _gyro_output(decoder.decode_bytes(data), as_dicts)
+
+def decode_bbl_files(file_paths: Iterable[str], max_workers: Optional[int] = None,
+                     as_dicts: bool = False) -> List[Dict[str, Any]]:
+    """Decode several BBL files in parallel worker processes"""
+    return _decode_in_parallel(partial(decode_bbl_file, as_dicts=as_dicts), file_paths, max_workers)
+
+def decode_bbl_buffers(buffers: Iterable[bytes], max_workers: Optional[int] = None,
+                       as_dicts: bool = False) -> List[Dict[str, Any]]:
+    """Decode several in-memory BBL logs in parallel worker processes"""
+    return _decode_in_parallel(partial(decode_bbl_bytes, as_dicts=as_dicts), buffers, max_workers)
+
+def to_dicts(gyro_data: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Convert columnar gyro data to one dict per sample"""
+    return [
+        {
+            'timestamp': timestamp,
+            'gyro_x': gyro[0],
+            'gyro_y': gyro[1],
+            'gyro_z': gyro[2],
+            'gyro_x_raw': raw[0],
+            'gyro_y_raw': raw[1],
+            'gyro_z_raw': raw[2]
+        }
+        for timestamp, gyro, raw in zip(gyro_data['timestamps'].tolist(),
+                                        gyro_data['gyro'].tolist(),
+                                        gyro_data['gyro_raw'].tolist())
+    ]
+
+def empty_gyro_data() -> Dict[str, np.ndarray]:
+    """Columnar gyro data with no samples, as returned for failed decodes"""
+    return {
+        'timestamps': np.zeros(0, dtype=np.int64),
+        'gyro': np.zeros((0, 3), dtype=np.float64),
+        'gyro_raw': np.zeros((0, 3), dtype=np.int64)
+    }
+
+def _gyro_output(result: Dict[str, Any], as_dicts: bool) -> Dict[str, Any]:
+    """Convert a result's gyro data to per-sample dicts if requested"""
+    if as_dicts:
+        result['gyro_data'] = to_dicts(result['gyro_data'])
+    return result
+
+def _decode_in_parallel(decode: Callable[[Any], Dict[str, Any]], items: Iterable[Any],
+                        max_workers: Optional[int]) -> List[Dict[str, Any]]:
+    """Map a decode function over independent logs, one process per CPU by default"""
+    items = list(items)
+    workers = min(max_workers or os.cpu_count() or 1, len(items))
+    
+    # Not worth starting a pool for a single log
+    if workers <= 1:
+        return [decode(item) for item in items]
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(decode, items))
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+Compiled frame decoding kernels
+Runs the main frame loop as a single Numba function over the raw byte buffer
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    from numba.core.errors import NumbaError
+    HAVE_NUMBA = True
+except ImportError:
+    # Numba is optional; without it the decoder uses its pure Python path.
+    # The kernels below still run (slowly) as plain Python for testing.
+    HAVE_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+    
+    class NumbaError(Exception):
+        """Stand-in for Numba's compilation error base class"""
+
+# Frame markers
+MARKER_I = ord('I')
+MARKER_P = ord('P')
+MARKER_S = ord('S')
+MARKER_G = ord('G')
+MARKER_H = ord('H')
+MARKER_E = ord('E')
+
+# Encodings and predictors understood by the kernel (see specs.py)
+ENC_SIGNED_VB = 0
+ENC_UNSIGNED_VB = 1
+ENC_NEG_14BIT = 3
+
+PRED_ZERO = 0
+PRED_STRAIGHT_LINE = 1
+PRED_AVERAGE_2 = 2
+PRED_INCREMENT = 5
+
+
+@njit(cache=True)
+def read_unsigned_vb(buf, pos):
+    """Read unsigned variable-length integer, returning (value, new_pos)"""
+    end = buf.shape[0]
+    if pos < end and buf[pos] < 0x80:
+        # Single-byte fast path
+        return np.int64(buf[pos]), pos + 1
+    result = 0
+    shift = 0
+    while True:
+        if pos >= end:
+            return 0, end
+        b = np.int64(buf[pos])
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            break
+        shift += 7
+        if shift > 28:
+            break
+    return result, pos
+
+
+@njit(cache=True)
+def read_signed_vb(buf, pos):
+    """Read signed variable-length integer, returning (value, new_pos)"""
+    end = buf.shape[0]
+    if pos < end and buf[pos] < 0x80:
+        # Single-byte fast path
+        return (np.int64(buf[pos]) ^ 0x40) - 0x40, pos + 1
+    result = 0
+    shift = 0
+    while True:
+        if pos >= end:
+            return 0, end
+        b = np.int64(buf[pos])
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            break
+        shift += 7
+        if shift > 28:
+            break
+    # Sign-extend from the top payload bit without a branch
+    sign_bit = np.int64(1) << (shift + 6)
+    return (result ^ sign_bit) - sign_bit, pos
+
+
+@njit(cache=True)
+def read_neg_14bit(buf, pos):
+    """Read negative 14-bit value, returning (value, new_pos)"""
+    end = buf.shape[0]
+    if pos + 2 > end:
+        return 0, end
+    value = np.int64(buf[pos]) | (np.int64(buf[pos + 1]) << 8)
+    return -(value & 0x3FFF), pos + 2
+
+
+@njit(cache=True)
+def read_field(buf, pos, encoding):
+    """Read a field value based on its encoding"""
+    if encoding == ENC_UNSIGNED_VB:
+        return read_unsigned_vb(buf, pos)
+    if encoding == ENC_NEG_14BIT:
+        return read_neg_14bit(buf, pos)
+    return read_signed_vb(buf, pos)
+
+
+@njit(cache=True)
+def skip_fields(buf, pos, encodings):
+    """Advance past a frame's fields without decoding them"""
+    end = buf.shape[0]
+    for k in range(encodings.shape[0]):
+        if encodings[k] == ENC_NEG_14BIT:
+            if pos + 2 > end:
+                return end
+            pos += 2
+        else:
+            # Readers give up on a varint after five bytes
+            for _ in range(5):
+                if pos >= end:
+                    return end
+                b = buf[pos]
+                pos += 1
+                if b < 0x80:
+                    break
+    return pos
+
+
+@njit(cache=True)
+def decode_frames(buf, pos, n, i_cols, i_enc, i_pred, p_cols, p_enc, p_pred,
+                  s_enc, g_enc, h_enc, e_enc, out, frame_types):
+    """
+    Decode frames from buf[pos:] into rows out[n:] of the column matrix.
+
+    *_cols map each field of the I/P schema to its column in `out`, *_enc and
+    *_pred hold the field encodings and predictors. S/G/H/E frames are
+    skipped using their field encodings. Earlier rows of `out` act as the
+    frame history for P frame predictors. Returns (n, pos, full); when
+    `full` is set, pos points at the next frame marker and the caller should
+    grow `out` and call again.
+    """
+    end = buf.shape[0]
+    cap = out.shape[0]
+
+    while pos < end:
+        marker = buf[pos]
+
+        if marker == MARKER_I or marker == MARKER_P:
+            if marker == MARKER_I:
+                cols = i_cols
+                enc = i_enc
+                pred = i_pred
+            else:
+                cols = p_cols
+                enc = p_enc
+                pred = p_pred
+
+            if cols.shape[0] == 0:
+                # No fields defined for this frame type
+                pos += 1
+                continue
+            if n >= cap:
+                return n, pos, True
+            pos += 1
+
+            predict = marker == MARKER_P and n > 0
+            for k in range(cols.shape[0]):
+                value, pos = read_field(buf, pos, enc[k])
+
+                if predict:
+                    col = cols[k]
+                    last = out[n - 1, col]
+                    predictor = pred[k]
+                    if predictor == PRED_ZERO:
+                        predicted = 0
+                    elif predictor == PRED_STRAIGHT_LINE:
+                        if n >= 2:
+                            predicted = 2 * last - out[n - 2, col]
+                        else:
+                            predicted = last
+                    elif predictor == PRED_AVERAGE_2:
+                        if n >= 2:
+                            predicted = (last + out[n - 2, col]) // 2
+                        else:
+                            predicted = last
+                    elif predictor == PRED_INCREMENT:
+                        predicted = last + 1
+                    else:
+                        predicted = last
+                    value += predicted
+
+                out[n, cols[k]] = value
+
+            frame_types[n] = marker
+            n += 1
+
+        elif marker == MARKER_S:
+            pos = skip_fields(buf, pos + 1, s_enc)
+
+        elif marker == MARKER_G:
+            pos = skip_fields(buf, pos + 1, g_enc)
+
+        elif marker == MARKER_H:
+            pos = skip_fields(buf, pos + 1, h_enc)
+
+        elif marker == MARKER_E:
+            pos = skip_fields(buf, pos + 1, e_enc)
+
+        else:
+            # Unknown frame type, stop parsing
+            break
+
+    return n, pos, False
@@ -4,7 +4,8 @@ Supabase Edge Function for BBL Decoder
 
 import json
 import base64
-from decoder import decode_bbl_bytes
+import orjson
+from decoder import decode_bbl_bytes, decode_bbl_buffers, empty_gyro_data
 
 def handler(event, context):
     """
@@ -16,14 +17,22 @@ def handler(event, context):
         "filename": "optional_filename.bbl"
     }
     
+    or, to decode several logs in parallel:
+    {
+        "files": [{"file_data": "...", "filename": "..."}, ...]
+    }
+    
     Returns:
     {
         "success": true/false,
-        "gyro_data": [...],
+        "gyro_data": {"timestamps": [...], "gyro": [[x, y, z], ...], "gyro_raw": [[x, y, z], ...]},
         "frame_count": number,
         "headers": {...},
         "error": "error_message" (if failed)
     }
+    
+    or, for a batch, {"success": true, "results": [...]} with one result
+    per file in request order.
     """
     
     try:
@@ -33,6 +42,19 @@ def handler(event, context):
         else:
             body = json.loads(event.get('body', '{}'))
         
+        if body and 'files' in body:
+            files = body.pop('files')
+            if not isinstance(files, list) or not all(isinstance(entry, dict) for entry in files):
+                return {
+                    'statusCode': 400,
+                    'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps({
+                        'error': 'files must be a list of objects with file_data',
+                        'success': False
+                    })
+                }
+            return _handle_batch(files)
+        
         if not body or 'file_data' not in body:
             return {
                 'statusCode': 400,
@@ -43,9 +65,13 @@ def handler(event, context):
                 })
             }
         
+        # Take the encoded upload out of the body so the only reference left
+        # is dropped as soon as it has been decoded
+        encoded_data = body.pop('file_data')
+        
         # Decode base64 data
         try:
-            file_data = base64.b64decode(body['file_data'])
+            file_data = base64.b64decode(encoded_data, validate=False)
         except Exception as e:
             return {
                 'statusCode': 400,
@@ -56,8 +82,11 @@ def handler(event, context):
                 })
             }
         
+        del encoded_data
+        
         # Decode BBL data
         result = decode_bbl_bytes(file_data)
+        del file_data
         
         # Add filename if provided
         if 'filename' in body:
@@ -66,7 +95,7 @@ def handler(event, context):
         return {
             'statusCode': 200,
             'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps(result)
+            'body': _dumps(result)
         }
         
     except Exception as e:
@@ -79,6 +108,47 @@ def handler(event, context):
             })
         }
 
+def _handle_batch(files):
+    """Decode a batch of uploaded files in parallel worker processes"""
+    results = [None] * len(files)
+    buffers = []
+    indices = []
+    
+    # Upload errors are reported per file so one bad file doesn't fail the batch
+    for i, entry in enumerate(files):
+        if 'file_data' not in entry:
+            results[i] = {'error': 'Missing file_data', 'success': False,
+                          'gyro_data': empty_gyro_data()}
+            continue
+        try:
+            buffers.append(base64.b64decode(entry.pop('file_data'), validate=False))
+            indices.append(i)
+        except Exception as e:
+            results[i] = {'error': f'Invalid base64 data: {str(e)}', 'success': False,
+                          'gyro_data': empty_gyro_data()}
+    
+    for i, result in zip(indices, decode_bbl_buffers(buffers)):
+        results[i] = result
+    del buffers
+    
+    # Add filenames if provided
+    for entry, result in zip(files, results):
+        if 'filename' in entry:
+            result['filename'] = entry['filename']
+    
+    return {
+        'statusCode': 200,
+        'headers': {'Content-Type': 'application/json'},
+        'body': _dumps({
+            'success': True,
+            'results': results
+        })
+    }
+
+def _dumps(result):
+    """Serialize a decode result, writing the gyro arrays directly with orjson"""
+    return orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
 # For local testing
 if __name__ == "__main__":
     # Test with sample data
@@ -5,8 +5,15 @@ Unit tests for BBL decoder
 import pytest
 import sys
 import os
+import json
+import base64
+import importlib.util
+from array import array
+import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from decoder import BBLDecoder, decode_bbl_bytes
+import kernels
+import decoder as decoder_module
+from decoder import BBLDecoder, decode_bbl_bytes, decode_bbl_buffers, to_dicts
 
 class TestBBLDecoder:
     
@@ -15,57 +22,95 @@ class TestBBLDecoder:
         decoder = BBLDecoder()
         assert decoder.headers == {}
         assert decoder.field_definitions == {}
-        assert decoder.gyro_data == []
+        assert decoder.columns == {}
+        assert decoder.gyro_data == {}
     
     def test_variable_length_integer_decoding(self):
         """Test variable-length integer decoding"""
         decoder = BBLDecoder()
         
-        # Test with simple bytes
-        from io import BytesIO
-        
         # Test unsigned VB: value 127 (0x7F)
-        stream = BytesIO(b'\x7F')
-        result = decoder._read_unsigned_vb(stream)
-        assert result == 127
+        result = decoder._read_unsigned_vb(memoryview(b'\x7F'), 0)
+        assert result == (127, 1)
         
         # Test unsigned VB: value 128 (0x80, 0x01)
-        stream = BytesIO(b'\x80\x01')
-        result = decoder._read_unsigned_vb(stream)
-        assert result == 128
+        result = decoder._read_unsigned_vb(memoryview(b'\x80\x01'), 0)
+        assert result == (128, 2)
+        
+        # Decoding continues from the returned offset
+        buf = memoryview(b'\x05\x80\x01')
+        value, pos = decoder._read_unsigned_vb(buf, 0)
+        assert (value, pos) == (5, 1)
+        assert decoder._read_unsigned_vb(buf, pos) == (128, 3)
+        
+        # Truncated value at end of buffer decodes as zero
+        assert decoder._read_unsigned_vb(memoryview(b'\x80'), 0) == (0, 1)
     
     def test_signed_variable_length_integer(self):
         """Test signed variable-length integer decoding"""
         decoder = BBLDecoder()
-        from io import BytesIO
         
         # Test positive value
-        stream = BytesIO(b'\x0A')  # 10
-        result = decoder._read_signed_vb(stream)
-        assert result == 10
+        result = decoder._read_signed_vb(memoryview(b'\x0A'), 0)  # 10
+        assert result == (10, 1)
         
         # Test zero
-        stream = BytesIO(b'\x00')
-        result = decoder._read_signed_vb(stream)
-        assert result == 0
+        result = decoder._read_signed_vb(memoryview(b'\x00'), 0)
+        assert result == (0, 1)
+        
+        # Test negative value
+        result = decoder._read_signed_vb(memoryview(b'\x7F'), 0)  # -1
+        assert result == (-1, 1)
     
-    def test_predictor_application(self):
-        """Test predictor-based decompression"""
+    def test_field_value_dispatch(self):
+        """Test field values are read with the reader for their encoding"""
         decoder = BBLDecoder()
+        buf = memoryview(b'\x7F\x34\x12')
         
-        # Set up frame history
-        decoder.frame_history = [
-            {'gyroADC[0]': 100, 'gyroADC[1]': 200},
-            {'gyroADC[0]': 110, 'gyroADC[1]': 210}
-        ]
+        assert decoder._read_field_value(buf, 0, 0) == (-1, 1)    # SIGNED_VB
+        assert decoder._read_field_value(buf, 0, 1) == (127, 1)   # UNSIGNED_VB
+        assert decoder._read_field_value(buf, 1, 3) == (-0x1234, 3)  # NEG_14BIT
+        
+        # Unknown encodings fall back to signed variable byte
+        assert decoder._read_field_value(buf, 0, 42) == (-1, 1)
+    
+    def test_header_parsing(self):
+        """Test headers are parsed and the frame data offset is returned"""
+        decoder = BBLDecoder()
+        data = b'H Product:Betaflight\r\nH Version: 4.3.0 \r\n  \r\n S \r\nI\x01'
+        
+        offset = decoder._parse_headers(data)
         
-        # Test ZERO predictor
-        result = decoder._apply_predictor(5, 'gyroADC[0]', 0)
-        assert result == 5  # 0 + 5
+        assert data[offset:] == b'I\x01'
+        assert decoder.headers == {'Product': 'Betaflight', 'Version': '4.3.0'}
+    
+    def test_runaway_predictions_keep_decoding(self, monkeypatch):
+        """Test predictions outside int64 wrap instead of cutting the log short"""
+        monkeypatch.setattr(kernels, 'HAVE_NUMBA', False)
+        
+        # Default layout: P frame time is STRAIGHT_LINE predicted and grows
+        # without bound across the interleaved I frames
+        gyro = [(k % 100) - 50 for k in range(3000)]
+        frames = b''.join(
+            (b'I\x01\x10' if k % 32 == 0 else b'P\x00\x05') + bytes([gyro[k] & 0x7F]) + b'\x00' * 5
+            for k in range(3000)
+        )
         
-        # Test STRAIGHT_LINE predictor
-        result = decoder._apply_predictor(5, 'gyroADC[0]', 1)
-        assert result == 125  # (2*110 - 100) + 5 = 120 + 5
+        result = decode_bbl_bytes(b'H Product:Test\nS\n' + frames)
+        
+        assert result['frame_count'] == 3000
+        assert result['gyro_data']['gyro_raw'][:, 0].tolist() == gyro
+        timestamps = result['gyro_data']['timestamps']
+        assert timestamps.dtype == np.int64 and timestamps[0] == 16
+    
+    @pytest.mark.parametrize('encodings', [b'', b'1,2,', b'0,x,1'])
+    def test_malformed_field_lists_rejected(self, encodings):
+        """Test malformed integer lists in field headers fail the decode"""
+        bbl_data = b'H Field I name:a,b,c\nH Field I encoding:' + encodings + b'\nS\nI\x01\x02\x03'
+        
+        result = decode_bbl_bytes(bbl_data)
+        
+        assert result['error'] == 'Failed to parse field definitions'
     
     def test_minimal_bbl_structure(self):
         """Test decoding minimal BBL structure"""
@@ -86,6 +131,94 @@ class TestBBLDecoder:
         # Should not error out
         assert 'error' not in result or result.get('success', False)
     
+    def test_compiled_kernel_matches_python_path(self, monkeypatch):
+        """Test the compiled frame kernel decodes the same data as the Python path"""
+        bbl_data = (
+            b'H Field I name:time,gyroADC[0],gyroADC[1],gyroADC[2]\n'
+            b'H Field I encoding:1,0,0,3\n'
+            b'H Field I predictor:0,0,0,0\n'
+            b'H Field P name:time,gyroADC[0],gyroADC[1],gyroADC[2]\n'
+            b'H Field P encoding:0,0,0,0\n'
+            b'H Field P predictor:1,1,2,5\n'
+            b'S\n'
+            b'I\xe8\x07\x14\x7f\x10\x00'  # Intra frame
+            b'P\x7d\x02\x7e\x00'           # Inter frames with predictors
+            b'P\x7d\x02\x01\x00'
+            b'E\x00\x00'                    # Event frame
+            b'P\x02\x7f\x7f\x7f'
+        )
+        
+        # Without Numba installed the kernel still runs as plain Python
+        monkeypatch.setattr(kernels, 'HAVE_NUMBA', False)
+        python_result = decode_bbl_bytes(bbl_data)
+        monkeypatch.setattr(kernels, 'HAVE_NUMBA', True)
+        compiled_result = decode_bbl_bytes(bbl_data)
+        
+        assert python_result['frame_count'] == 4
+        assert compiled_result['frame_count'] == 4
+        assert to_dicts(compiled_result['gyro_data']) == to_dicts(python_result['gyro_data'])
+        
+        # A long log whose STRAIGHT_LINE time predictions leave int64 decodes
+        # to the same wrapped values on both paths
+        long_data = b'H Product:Test\nS\n' + b''.join(
+            (b'I\x01\x10' if k % 32 == 0 else b'P\x00\x05') + bytes([k & 0x7F, 0x7F, 0x01]) + b'\x00' * 3
+            for k in range(3000)
+        )
+        monkeypatch.setattr(kernels, 'HAVE_NUMBA', False)
+        python_decoder = BBLDecoder()
+        python_result = python_decoder.decode_bytes(long_data)
+        monkeypatch.setattr(kernels, 'HAVE_NUMBA', True)
+        compiled_decoder = BBLDecoder()
+        compiled_result = compiled_decoder.decode_bytes(long_data)
+        
+        assert python_result['frame_count'] == compiled_result['frame_count'] == 3000
+        for name, column in python_decoder.columns.items():
+            assert list(column) == compiled_decoder.columns[name].tolist()
+        assert to_dicts(compiled_result['gyro_data']) == to_dicts(python_result['gyro_data'])
+    
+    def test_kernel_compile_failure_falls_back(self, monkeypatch):
+        """Test a kernel that fails to compile falls back to the Python path"""
+        bbl_data = b'H Field I name:gyroADC[0]\nS\nI\x01I\x02'
+        
+        def fail_to_compile(*args):
+            raise kernels.NumbaError('typing failed')
+        
+        monkeypatch.setattr(kernels, 'HAVE_NUMBA', True)
+        monkeypatch.setattr(kernels, 'decode_frames', fail_to_compile)
+        result = decode_bbl_bytes(bbl_data)
+        
+        assert result['frame_count'] == 2
+        assert result['gyro_data']['gyro_raw'][:, 0].tolist() == [1, 2]
+        assert kernels.HAVE_NUMBA is False
+        
+        # Other kernel errors are reported rather than decoded as empty
+        def crash(*args):
+            raise RuntimeError('kernel crashed')
+        
+        monkeypatch.setattr(kernels, 'HAVE_NUMBA', True)
+        monkeypatch.setattr(kernels, 'decode_frames', crash)
+        assert 'kernel crashed' in decode_bbl_bytes(bbl_data)['error']
+    
+    @pytest.mark.parametrize('have_numba', [False, True])
+    def test_skipped_frames_use_header_schema(self, monkeypatch, have_numba):
+        """Test slow frames are skipped using the field count from the headers"""
+        monkeypatch.setattr(kernels, 'HAVE_NUMBA', have_numba)
+        bbl_data = (
+            b'H Field I name:gyroADC[0]\n'
+            b'H Field S name:flightModeFlags,stateFlags\n'
+            b'H Field S encoding:1,3\n'
+            b'S\n'
+            b'I\x01'
+            b'S\x81\x01\xff\xff'  # Two-byte varint, then a NEG_14BIT field
+            b'I\x02'
+            b'I\x03'
+        )
+        
+        result = decode_bbl_bytes(bbl_data)
+        
+        assert result['frame_count'] == 3
+        assert result['gyro_data']['gyro_raw'][:, 0].tolist() == [1, 2, 3]
+    
     def test_empty_data_handling(self):
         """Test handling of empty or invalid data"""
         result = decode_bbl_bytes(b'')
@@ -93,23 +226,38 @@ class TestBBLDecoder:
         
         result = decode_bbl_bytes(b'invalid data')
         assert 'error' in result
+        
+        # Failed decodes keep the columnar gyro data shape, with no samples
+        assert result['gyro_data']['timestamps'].shape == (0,)
+        assert result['gyro_data']['gyro'].shape == (0, 3)
+        assert result['gyro_data']['gyro_raw'].shape == (0, 3)
+        assert decode_bbl_bytes(b'', as_dicts=True)['gyro_data'] == []
     
     def test_gyro_data_extraction(self):
         """Test gyro data extraction and scaling"""
         decoder = BBLDecoder()
         
-        # Mock frame data
-        frame_data = {
-            'gyroADC[0]': 1640,  # Should scale to ~100 deg/s
-            'gyroADC[1]': -820,  # Should scale to ~-50 deg/s
-            'gyroADC[2]': 0,     # Should scale to 0 deg/s
-            'time': 1000
+        # Mock decoded columns for a single intra frame
+        decoder.field_definitions = {
+            'I': {name: {'encoding': 0, 'predictor': 0}
+                  for name in ('time', 'gyroADC[0]', 'gyroADC[1]', 'gyroADC[2]')}
+        }
+        decoder.columns = {
+            'gyroADC[0]': array('q', [1640]),  # Should scale to ~100 deg/s
+            'gyroADC[1]': array('q', [-820]),  # Should scale to ~-50 deg/s
+            'gyroADC[2]': array('q', [0]),     # Should scale to 0 deg/s
+            'time': array('q', [1000])
         }
+        decoder.frame_types = array('B', b'I')
         
-        decoder._extract_gyro_data(frame_data)
+        decoder._extract_gyro_data()
         
-        assert len(decoder.gyro_data) == 1
-        gyro_point = decoder.gyro_data[0]
+        assert decoder.gyro_data['timestamps'].tolist() == [1000]
+        assert decoder.gyro_data['gyro'].shape == (1, 3)
+        assert decoder.gyro_data['gyro_raw'].tolist() == [[1640, -820, 0]]
+        
+        # The per-sample dict view carries the same values
+        gyro_point = to_dicts(decoder.gyro_data)[0]
         
         assert gyro_point['timestamp'] == 1000
         assert abs(gyro_point['gyro_x'] - 100.0) < 1.0  # ~100 deg/s
@@ -121,23 +269,134 @@ class TestBBLDecoder:
         assert gyro_point['gyro_y_raw'] == -820
         assert gyro_point['gyro_z_raw'] == 0
     
-    def test_frame_history_management(self):
-        """Test frame history is properly managed"""
+    def test_column_storage(self, monkeypatch):
+        """Test decoded frames are stored as one column per field"""
+        monkeypatch.setattr(kernels, 'HAVE_NUMBA', False)
+        bbl_data = (
+            b'H Field I name:gyroADC[0],accSmooth[0]\n'
+            b'H Field P name:gyroADC[0]\n'
+            b'S\n'
+            + b'I\x01\x02' + b''.join(b'P' + bytes([i]) for i in range(14))
+        )
+        
         decoder = BBLDecoder()
+        result = decoder.decode_bytes(bbl_data)
+        
+        assert result['frame_count'] == 15
+        assert list(decoder.columns['gyroADC[0]']) == [1] + list(range(14))
+        # Fields missing from a frame type are stored as zero
+        assert list(decoder.columns['accSmooth[0]']) == [2] + [0] * 14
+        assert bytes(decoder.frame_types) == b'I' + b'P' * 14
+        assert len(decoder.gyro_data['timestamps']) == 15
+
+    def test_generated_frame_decoder_predictors(self, monkeypatch):
+        """Test the generated P frame decoder applies each field's predictor"""
+        monkeypatch.setattr(kernels, 'HAVE_NUMBA', False)
+        bbl_data = (
+            b'H Field I name:a,b,c,d\n'
+            b'H Field P name:a,b,c,d\n'
+            b'H Field P predictor:1,2,5,0\n'
+            b'S\n'
+            b'I\x0a\x0a\x0a\x0a' b'P\x00\x00\x00\x00' b'P\x01\x02\x00\x7f'
+        )
+        
+        decoder = BBLDecoder()
+        result = decoder.decode_bytes(bbl_data)
+        
+        assert result['frame_count'] == 3
+        assert list(decoder.columns['a']) == [10, 10, 11]
+        assert list(decoder.columns['b']) == [10, 10, 12]
+        assert list(decoder.columns['c']) == [10, 11, 12]
+        assert list(decoder.columns['d']) == [10, 0, -1]
+        
+        # Logs with the same field layout share one compiled decoder
+        other = BBLDecoder()
+        other.decode_bytes(bbl_data)
+        assert other._decoders['P'].__code__ is decoder._decoders['P'].__code__
+
+    def test_wide_layouts_use_field_loop(self, monkeypatch):
+        """Test layouts too wide for generated code decode the same with a loop"""
+        monkeypatch.setattr(kernels, 'HAVE_NUMBA', False)
+        names = b','.join(b'f%d' % i for i in range(300))
+        bbl_data = (
+            b'H Field I name:' + names + b'\n'
+            b'H Field P name:' + names + b'\n'
+            b'H Field P predictor:' + b','.join([b'1', b'2', b'5', b'0'] * 75) + b'\n'
+            b'S\n'
+            b'I' + b'\x0a' * 300 + (b'P' + b'\x02' * 300) * 3
+        )
+        
+        wide = BBLDecoder()
+        wide.decode_bytes(bbl_data)
+        
+        monkeypatch.setattr(decoder_module, '_MAX_GENERATED_COLUMNS', 1000)
+        generated = BBLDecoder()
+        generated.decode_bytes(bbl_data)
+        
+        assert len(wide.frame_types) == 4
+        assert wide._decoders['P'].__code__.co_filename == decoder_module.__file__
+        for name in ('f0', 'f1', 'f2', 'f3', 'f299'):
+            assert list(wide.columns[name]) == list(generated.columns[name])
+        assert list(wide.columns['f0']) == [10, 12, 16, 22]
+
+    def test_parallel_batch_decoding(self):
+        """Test a batch of logs decodes in worker processes, in input order"""
+        logs = [
+            b'H Field I name:gyroADC[0]\nS\n' + b'I' + bytes([i]) * (i + 1)
+            for i in range(1, 4)
+        ]
+        
+        results = decode_bbl_buffers(logs, max_workers=2, as_dicts=True)
+        
+        assert results == [decode_bbl_bytes(log, as_dicts=True) for log in logs]
+        assert [result['frame_count'] for result in results] == [1, 1, 1]
+
+    def test_edge_function_batch(self):
+        """Test the edge function maps per-file results back to request order"""
+        spec = importlib.util.spec_from_file_location(
+            'edge_function',
+            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'supabase', 'functions', 'decoder', 'index.py'))
+        edge_function = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(edge_function)
+        
+        good = b'H Field I name:gyroADC[0]\nS\nI\x01I\x02'
+        files = [
+            {'file_data': base64.b64encode(good).decode(), 'filename': 'good.bbl'},
+            {'filename': 'missing.bbl'},
+            {'file_data': 'abc', 'filename': 'bad_base64.bbl'},
+            {'file_data': base64.b64encode(b'not a log').decode()},
+            {'file_data': base64.b64encode(good[:-2]).decode(), 'filename': 'short.bbl'},
+        ]
+        
+        response = edge_function.handler({'body': json.dumps({'files': files})}, None)
+        body = json.loads(response['body'])
+        results = body['results']
+        
+        assert response['statusCode'] == 200
+        assert body['success'] is True
+        assert [result.get('filename') for result in results] == [
+            'good.bbl', 'missing.bbl', 'bad_base64.bbl', None, 'short.bbl']
+        
+        assert results[0]['frame_count'] == 2
+        assert results[0]['gyro_data']['gyro_raw'] == [[1, 0, 0], [2, 0, 0]]
+        assert results[1]['error'] == 'Missing file_data'
+        assert results[2]['error'].startswith('Invalid base64 data')
+        assert results[3]['error'] == 'Failed to parse headers'
+        assert results[4]['frame_count'] == 1
+        
+        # Failed files keep the same gyro data keys as decoded ones
+        for result in results[1:4]:
+            assert result['gyro_data'] == {'timestamps': [], 'gyro': [], 'gyro_raw': []}
         
-        # Simulate the actual frame processing logic
-        for i in range(15):
-            frame_data = {'gyroADC[0]': i, 'frame_type': 'I'}
-            decoder._extract_gyro_data(frame_data)
-            decoder.frame_history.append(frame_data)
-            
-            # Apply the same trimming logic as in _parse_data_frames
-            if len(decoder.frame_history) > 10:
-                decoder.frame_history = decoder.frame_history[-10:]
-        
-        # Should keep only last 10 frames
-        assert len(decoder.frame_history) <= 10
-        assert len(decoder.gyro_data) == 15  # But all gyro data is kept
+        # A files value that isn't a list of objects is rejected as a whole
+        for files in ('abc', {'a': 1}, [None], [files[0], 'abc']):
+            response = edge_function.handler({'body': json.dumps({'files': files})}, None)
+            assert response['statusCode'] == 400
+            assert json.loads(response['body']) == {
+                'error': 'files must be a list of objects with file_data',
+                'success': False
+            }
 
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file